@@ -1,28 +1,60 @@
 """The Neo Smart Blinds (Cloud) integration."""
+import asyncio
 import logging
+from collections import defaultdict
+from contextlib import AsyncExitStack
+
+import httpx
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.httpx_client import get_async_client 
 from homeassistant.const import CONF_USERNAME, Platform
 
 from homeassistant.helpers import device_registry as dr, entity_platform
+from homeassistant.helpers.storage import Store
+from homeassistant.util.ssl import get_default_context
 
-from .const import DOMAIN
+from .const import DOMAIN, CMD_FAV, CMD_FAV2
 from .api import (
     NeoSmartCloudAPI, 
     NeoSmartCloudAuthError, 
-    parse_controllers_from_data
+    REQUEST_TIMEOUT,
+    STATIC_HEADERS,
+    parse_all
 )
 
 PLATFORMS: list[Platform] = [Platform.COVER, Platform.SWITCH, Platform.BUTTON]
 _LOGGER = logging.getLogger(__name__)
 
+# Last successful location payload, used to set up entities without waiting on the cloud
+STORAGE_VERSION = 1
+
+# Dedicated pool so bursts of commands reuse warm TCP+TLS connections.
+# HTTP/2 is negotiated via ALPN; httpx falls back to HTTP/1.1 otherwise.
+HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=10,
+    max_connections=20,
+    keepalive_expiry=60.0,
+)
+
+# Favorite service name -> command it sends
+FAVORITE_SERVICES = {
+    "favorite_1": CMD_FAV,
+    "favorite_2": CMD_FAV2,
+}
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Neo Smart Blinds (Cloud) from a config entry."""
     
     hass.data.setdefault(DOMAIN, {})
-    cloud_client = get_async_client(hass, verify_ssl=True)
+    # Built directly: HA's client factory fixes its own limits, so they cannot be tuned there
+    cloud_client = httpx.AsyncClient(
+        verify=get_default_context(),
+        http2=True,
+        headers=STATIC_HEADERS,
+        limits=HTTP_LIMITS,
+        timeout=httpx.Timeout(REQUEST_TIMEOUT),
+    )
     
     cloud_api = NeoSmartCloudAPI(
         hass=hass, 
@@ -31,24 +63,63 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         options=entry.options
     )
     
-    try:
-        await cloud_api.async_login()
-        full_data = await cloud_api.async_get_data()
-    except NeoSmartCloudAuthError as err:
-        raise ConfigEntryAuthFailed from err
-    except Exception as err:
-        _LOGGER.error("Failed to login and fetch data: %s", err)
-        return False
-        
-    hass.data[DOMAIN][entry.entry_id] = {"api": cloud_api, "data": full_data}
+    store = Store(hass, STORAGE_VERSION, _storage_key(entry))
+    full_data = await store.async_load()
+    from_cache = full_data is not None
+
+    if not from_cache:
+        try:
+            await cloud_api.async_login()
+            full_data = await cloud_api.async_get_data()
+        except NeoSmartCloudAuthError as err:
+            await cloud_client.aclose()
+            raise ConfigEntryAuthFailed from err
+        except Exception as err:
+            await cloud_client.aclose()
+            _LOGGER.error("Failed to login and fetch data: %s", err)
+            return False
+        await store.async_save(full_data)
+
+    parsed = parse_all(full_data)
+    if from_cache:
+        async def async_refresh_cached_data() -> None:
+            """Log in and refresh the cached data, reloading if the account changed."""
+            try:
+                await cloud_api.async_ensure_logged_in()
+                fresh_data = await cloud_api.async_get_data()
+            except NeoSmartCloudAuthError:
+                entry.async_start_reauth(hass)
+                return
+            except Exception as err:
+                _LOGGER.warning("Failed to refresh cached Neo cloud data: %s", err)
+                return
+            await store.async_save(fresh_data)
+            # Compare what entities are built from, so unused or volatile fields never reload
+            if parse_all(fresh_data) != parsed:
+                _LOGGER.info("Neo cloud data changed since it was cached, reloading")
+                hass.config_entries.async_schedule_reload(entry.entry_id)
+
+        entry.async_create_background_task(
+            hass, async_refresh_cached_data(), f"{DOMAIN} refresh cached data"
+        )
+
+    entry.async_on_unload(cloud_api.async_shutdown)
+    entry.async_on_unload(cloud_client.aclose)
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        "api": cloud_api,
+        "parsed": parsed,
+        "locks": {},
+    }
 
     device_registry = dr.async_get(hass)
 
     # 1. Create the top-level "Account" device
     account_username = entry.data[CONF_USERNAME]
+    account_identifier = (DOMAIN, account_username)
     device_registry.async_get_or_create(
         config_entry_id=entry.entry_id,
-        identifiers={(DOMAIN, account_username)},
+        identifiers={account_identifier},
         name=f"Neo Blinds ({account_username})",
         manufacturer="Neo Smart Blinds",
         model="Cloud Account",
@@ -56,15 +127,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
 
     # 2. Create the "Controller" devices
-    controllers = parse_controllers_from_data(full_data)
-    for controller in controllers:
+    controller_kwargs = {
+        "config_entry_id": entry.entry_id,
+        "manufacturer": "Neo Smart Blinds",
+        "model": "Cloud Controller",
+        "via_device": account_identifier,
+    }
+    for controller in parsed.controllers:
         device_registry.async_get_or_create(
-            config_entry_id=entry.entry_id,
             identifiers={(DOMAIN, controller["id"])},
             name=f"Neo Controller ({controller['room_name']})",
-            manufacturer="Neo Smart Blinds",
-            model="Cloud Controller",
-            via_device=(DOMAIN, account_username) 
+            **controller_kwargs,
         )
     
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -75,22 +148,51 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # entities in automations instead. Consider removing these in a future version.
     async def handle_favorite(call: ServiceCall):
         """Handle favorite service calls."""
-        method = "favorite_1" if call.service == "favorite_1" else "favorite_2"
+        command = FAVORITE_SERVICES[call.service]
         platforms = entity_platform.async_get_platforms(hass, DOMAIN)
-        
+
+        # Group every targeted blind by API client so each account sends one request
+        batches = defaultdict(list)
         for platform in platforms:
             if platform.domain == Platform.COVER:
-                entities = await platform.async_extract_from_service(call)
+                for entity in await platform.async_extract_from_service(call):
+                    batches[entity.api].append(entity)
+
+        async def send_batch(api: NeoSmartCloudAPI, entities: list) -> None:
+            commands = [
+                (controller_id, token, channel, command, motor_code)
+                for entity in entities
+                for controller_id, token, channel, motor_code in entity.command_targets
+            ]
+            # Hold every targeted entity's command lock, as the entities do for their own
+            # commands. Rooms on one controller share a lock, and a fixed order avoids deadlocks.
+            locks = {id(entity.command_lock): entity.command_lock for entity in entities}
+            async with AsyncExitStack() as stack:
+                for _, lock in sorted(locks.items()):
+                    await stack.enter_async_context(lock)
+                sent = await api.async_send_commands(commands)
+            if sent:
                 for entity in entities:
-                    if hasattr(entity, method):
-                        await getattr(entity, method)()
+                    entity.favorite_sent()
 
-    hass.services.async_register(DOMAIN, "favorite_1", handle_favorite)
-    hass.services.async_register(DOMAIN, "favorite_2", handle_favorite)
+        results = await asyncio.gather(
+            *(send_batch(api, entities) for api, entities in batches.items()),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                _LOGGER.error("Failed to trigger %s: %s", call.service, result)
+
+    for service in FAVORITE_SERVICES:
+        hass.services.async_register(DOMAIN, service, handle_favorite)
 
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     return True
 
+def _storage_key(entry: ConfigEntry) -> str:
+    """Return the storage key for an entry's cached location data."""
+    return f"{DOMAIN}.{entry.entry_id}"
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     await hass.config_entries.async_reload(entry.entry_id)
 
@@ -100,6 +202,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN].pop(entry.entry_id)
         # Clean up registered services if no other config entries remain
         if not hass.data[DOMAIN]:
-            hass.services.async_remove(DOMAIN, "favorite_1")
-            hass.services.async_remove(DOMAIN, "favorite_2")
+            for service in FAVORITE_SERVICES:
+                hass.services.async_remove(DOMAIN, service)
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached location data when the entry is deleted."""
+    await Store(hass, STORAGE_VERSION, _storage_key(entry)).async_remove()
@@ -1,15 +1,19 @@
 """API for Neo Smart Blinds (Cloud)."""
+import asyncio
 import httpx
 import logging
 import base64
-import json
+import random
 import time
-import random 
-import copy   
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
 
 from homeassistant.core import HomeAssistant
 from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
+from homeassistant.helpers.json import json_bytes
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.util.json import json_loads
 
 from .const import (
     DOMAIN,
@@ -17,7 +21,7 @@ from .const import (
     API_TOKEN_URL,
     API_LOCATION_URL,
     API_COMMAND_URL,
-    API_SCHEDULE_UPDATE_URL, 
+    API_SCHEDULES_URL, 
     CLIENT_ID,
     OAUTH_REDIRECT_URI,
     CMD_UP,
@@ -30,20 +34,51 @@ from .pkce import CODE_CHALLENGE_METHOD, generate_pkce_pair
 
 _LOGGER = logging.getLogger(__name__)
 REQUEST_TIMEOUT = 15.0
+# Identical commands to the same blind within this window (seconds) are dropped
+COMMAND_DEDUP_WINDOW = 0.3
+# Seconds the command writer waits after the first queued command to collect a batch
+COMMAND_BATCH_WINDOW = 0.1
+# Seconds schedule toggles are collected before they are sent together
+SCHEDULE_BATCH_WINDOW = 0.05
+# Consecutive cloud failures that open the circuit, and seconds before it is probed again
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30.0
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+# Bulkhead: at most this many requests from one account are in flight at once
+MAX_CONCURRENT_REQUESTS = 4
+# Bounded retries with full-jitter exponential backoff for transient failures
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.25
+RETRY_MAX_DELAY = 8.0
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+# Errors raised before the request reached the server, safe to retry for any method
+RETRY_SAFE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+STATIC_HEADERS = {
+    "Origin": "https://app.neosmartblinds.com",
+    "Referer": "https://app.neosmartblinds.com/",
+}
+# Bodies are pre-encoded with orjson, so the content type is set explicitly
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Two-digit channel codes keyed by both raw and already-padded channel strings
+_CHANNEL_CODES = {key: f"{i:02d}" for i in range(100) for key in (str(i), f"{i:02d}")}
 
 # --- HELPER FUNCTION FOR SCHEDULE NAMES ---
+_CMD_FRIENDLY_NAMES = {
+    "up": "Open", "dn": "Close", "sp": "Stop",
+    "i1": "Favorite 1", "i2": "Favorite 2", "gp": "Favorite (GP)",
+    "cl": "Close", "u4": "Middle Up", "d4": "Middle Down",
+    "u2": "Lower Up", "d2": "Lower Down"
+}
+
 def _get_friendly_command_name(command: str) -> str:
     """Translate a command code to a friendly name."""
-    cmd_map = {
-        "up": "Open", "dn": "Close", "sp": "Stop",
-        "i1": "Favorite 1", "i2": "Favorite 2", "gp": "Favorite (GP)",
-        "cl": "Close", "u4": "Middle Up", "d4": "Middle Down",
-        "u2": "Lower Up", "d2": "Lower Down"
-    }
-    friendly_name = cmd_map.get(command)
+    friendly_name = _CMD_FRIENDLY_NAMES.get(command)
     if friendly_name:
         return friendly_name
-    if command.isdigit():
+    if command.isdecimal():
         return f"Position {command}%"
     return command.upper()
 
@@ -51,33 +86,42 @@ def _get_friendly_command_name(command: str) -> str:
 def _sanitize_payload(payload: dict) -> dict:
     """Return a copy of the command payload with sensitive values redacted."""
     try:
-        # Use deepcopy to ensure we don't modify the original payload
-        safe_payload = copy.deepcopy(payload) 
-        
-        # The payload keys are the sensitive controller strings
-        for controller_id in list(safe_payload.keys()):
-            # Get the list of commands
-            commands = safe_payload.pop(controller_id) 
-            
-            # Re-add with a redacted key
-            safe_controller_key = f"[REDACTED_CONTROLLER_ID:{controller_id[:4]}...]"
-            safe_payload[safe_controller_key] = commands
-            
-            # Now redact the contents of the command list
-            for command_data in commands:
-                if "token" in command_data:
-                    command_data["token"] = "[REDACTED_TOKEN]"
-                if "hash" in command_data:
-                    command_data["hash"] = "[REDACTED_HASH]"
-        return safe_payload
-    except Exception as e:
+        # The payload keys are the sensitive controller strings; rebuild a new
+        # dict rather than copying so the original payload is never modified
+        return {
+            f"[REDACTED_CONTROLLER_ID:{controller_id[:4]}...]": [
+                {**command_data, "token": "[REDACTED_TOKEN]", "hash": "[REDACTED_HASH]"}
+                for command_data in commands
+            ]
+            for controller_id, commands in payload.items()
+        }
+    except (AttributeError, TypeError) as e:
         _LOGGER.error("Failed to sanitize payload: %s", e)
         return {"error": "Payload sanitization failed"}
 
 
+# --- JWT DECODING ---
+@lru_cache(maxsize=8)
+def _decode_token_payload(token: str) -> dict | None:
+    """Decode a JWT and return its payload as a dict (cached per token).
+
+    The returned dict is shared between callers and must not be modified.
+    """
+    try:
+        payload_b64 = token.split('.', 2)[1]
+        payload_b64 += '=' * (-len(payload_b64) & 3)
+        return json_loads(base64.urlsafe_b64decode(payload_b64))
+    except Exception as err:
+        _LOGGER.error("Failed to decode token: %s", err)
+        return None
+
+
 class NeoSmartCloudAuthError(Exception):
     """Exception for authentication errors."""
 
+class NeoSmartCloudUnavailableError(Exception):
+    """Exception raised without a request while the cloud is failing."""
+
 class NeoSmartCloudAPI:
     """A client for the Neo Smart Blinds Cloud API."""
 
@@ -95,45 +139,55 @@ class NeoSmartCloudAPI:
         self._options = options or {}
         self._access_token = None
         self._refresh_token = None
+        # Static headers plus the current bearer token, rebuilt only when tokens change
+        self._auth_headers = STATIC_HEADERS
         self._user_uuid = None 
+        self._schedules_url = None
+        self._token_payload = None
         self._client = client
         self._controller_map = {} 
+        self._controller_strings = None
+        # (controller_id, blind_code) -> (last command sent, monotonic time it was sent)
+        self._last_commands: dict[tuple[str, str], tuple[str, float]] = {}
+        # Circuit breaker: fail fast while the cloud is down instead of waiting on timeouts
+        self._cb_state = CIRCUIT_CLOSED
+        self._cb_failures = 0
+        self._cb_opened_at = 0.0
+        # Set while the single half-open probe request is outstanding
+        self._cb_probe_in_flight = False
+        self._request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        # Set once the cloud rejects the credentials; later sends fail fast until reauth
+        self._auth_failed = False
+        # Serializes token refreshes so concurrent 401s trigger a single refresh
+        self._refresh_lock = asyncio.Lock()
+        # Commands queued for the background writer, which batches bursts into one POST
+        self._command_queue: asyncio.Queue[tuple[list, asyncio.Future]] = asyncio.Queue()
+        self._writer_task: asyncio.Task | None = None
+        # schedule_id -> (latest requested state, callers waiting on it)
+        self._pending_schedules: dict[str, tuple[bool, list[asyncio.Future]]] = {}
+        self._schedule_flush_task: asyncio.Task | None = None
         
         # Default logging level to Redacted if not specified
         self._log_level = self._options.get(
             "debug_logging_level", "Enable Redacted Payload Debug Logging"
         )
 
+    def _set_tokens(self, access_token: str, refresh_token: str) -> None:
+        """Store new tokens and rebuild the request headers that carry them."""
+        self._access_token = access_token
+        self._refresh_token = refresh_token
+        self._auth_headers = {**STATIC_HEADERS, "Authorization": f"Bearer {access_token}"}
+
     def get_user_uuid(self) -> str | None:
         """Return the user's UUID."""
         return self._user_uuid
 
-    def _decode_token(self, token: str, key: str):
-        """Decode a JWT and extract a specific key."""
-        try:
-            payload_b64 = token.split('.')[1]
-            payload_b64 += '=' * (-len(payload_b64) % 4)
-            payload_json = base64.urlsafe_b64decode(payload_b64).decode('utf-8')
-            payload_data = json.loads(payload_json)
-            value = payload_data.get(key)
-            if not value:
-                _LOGGER.error("Token payload did not contain '%s' key", key)
-                return None
-            return value
-        except Exception as err:
-            _LOGGER.error("Failed to decode token: %s", err)
-            return None
-
     def _generate_hash(self) -> str:
         """Generate the 7-digit hash required by the API."""
-        try:
-            time_ms = str(int(time.time() * 1000))
-            hash_string = time_ms[-7:]
-            _LOGGER.debug("Generated hash: %s", hash_string)
-            return hash_string
-        except Exception as err:
-            _LOGGER.error("Failed to generate hash: %s", err)
-            return str(random.randint(1000000, 9999999))
+        # Last 7 digits of the current epoch time in milliseconds
+        hash_string = f"{(time.time_ns() // 1_000_000) % 10_000_000:07d}"
+        _LOGGER.debug("Generated hash: %s", hash_string)
+        return hash_string
 
     async def async_login(self) -> None:
         """Log in to the API with PKCE and store the auth tokens."""
@@ -152,12 +206,11 @@ class NeoSmartCloudAPI:
             "client_id": CLIENT_ID,
             "redirect_uri": OAUTH_REDIRECT_URI,
         }
-        headers = {"Origin": "https://app.neosmartblinds.com", "Referer": "https://app.neosmartblinds.com/"}
         try:
             authorize_response = await self._client.post(
                 API_AUTHORIZE_NATIVE_URL,
                 json=authorize_payload,
-                headers=headers,
+                headers=STATIC_HEADERS,
                 timeout=REQUEST_TIMEOUT,
             )
             authorize_response.raise_for_status()
@@ -170,18 +223,20 @@ class NeoSmartCloudAPI:
             token_payload["code"] = authorization_code
             token_payload["code_verifier"] = code_verifier
 
-            response = await self._client.post(API_TOKEN_URL, data=token_payload, headers=headers, timeout=REQUEST_TIMEOUT)
+            response = await self._client.post(API_TOKEN_URL, data=token_payload, headers=STATIC_HEADERS, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             if "access_token" not in data or "refresh_token" not in data:
                 _LOGGER.error("Login response missing tokens")
                 raise NeoSmartCloudAuthError("Login failed, response missing tokens")
-            self._access_token = data["access_token"]
-            self._refresh_token = data["refresh_token"]
-            self._user_uuid = self._decode_token(self._access_token, "usr")
+            self._set_tokens(data["access_token"], data["refresh_token"])
+            self._token_payload = _decode_token_payload(self._access_token) or {}
+            self._user_uuid = self._token_payload.get("usr")
             if not self._user_uuid:
+                _LOGGER.error("Token payload did not contain 'usr' key")
                 raise NeoSmartCloudAuthError("Login succeeded, but failed to parse user UUID from token")
-            self._parse_controller_map_from_token(self._access_token)
+            self._parse_controller_map_from_token(self._token_payload)
+            self._schedules_url = API_SCHEDULES_URL.format(uuid=self._user_uuid)
             _LOGGER.info("Successfully logged in to Neo cloud")
         except httpx.HTTPStatusError as err:
             _LOGGER.error("Login failed: %s", err)
@@ -198,102 +253,297 @@ class NeoSmartCloudAPI:
             "refresh_token": self._refresh_token,
             "client_id": CLIENT_ID,
         }
-        headers = {"Origin": "https://app.neosmartblinds.com", "Referer": "https://app.neosmartblinds.com/"}
         try:
             # Uses shared client to avoid blocking calls
-            response = await self._client.post(API_TOKEN_URL, data=payload, headers=headers, timeout=REQUEST_TIMEOUT)
+            response = await self._client.post(API_TOKEN_URL, data=payload, headers=STATIC_HEADERS, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             if "access_token" not in data or "refresh_token" not in data:
                 _LOGGER.error("Refresh response missing tokens")
                 return False
-            self._access_token = data["access_token"]
-            self._refresh_token = data["refresh_token"]
-            self._user_uuid = self._decode_token(self._access_token, "usr")
+            self._set_tokens(data["access_token"], data["refresh_token"])
+            self._token_payload = _decode_token_payload(self._access_token) or {}
+            self._user_uuid = self._token_payload.get("usr")
             if not self._user_uuid:
+                _LOGGER.error("Token payload did not contain 'usr' key")
                 return False
-            self._parse_controller_map_from_token(self._access_token)
+            self._parse_controller_map_from_token(self._token_payload)
+            self._schedules_url = API_SCHEDULES_URL.format(uuid=self._user_uuid)
             _LOGGER.debug("Successfully refreshed Neo cloud token")
             return True
         except Exception:
             _LOGGER.error("Failed to refresh token, re-login required", exc_info=True)
             return False
 
+    async def async_ensure_logged_in(self) -> None:
+        """Log in unless a login has already succeeded.
+
+        After the credentials have been rejected once, raises without posting
+        them again, so commands cannot trip rate limits or lock the account.
+        """
+        if self._access_token:
+            return
+        async with self._refresh_lock:
+            if self._access_token:
+                return
+            if self._auth_failed:
+                raise NeoSmartCloudAuthError("Credentials rejected, reauthentication required")
+            try:
+                await self.async_login()
+            except NeoSmartCloudAuthError:
+                self._auth_failed = True
+                raise
+
+    def _circuit_check(self) -> bool:
+        """Admit a request, raising while the circuit is open or a probe is outstanding.
+
+        Returns True if the caller is the single half-open probe, which must
+        clear _cb_probe_in_flight when it finishes.
+        """
+        if self._cb_state == CIRCUIT_CLOSED:
+            return False
+        if (
+            self._cb_state == CIRCUIT_OPEN
+            and time.monotonic() - self._cb_opened_at < CIRCUIT_RESET_TIMEOUT
+        ) or self._cb_probe_in_flight:
+            raise NeoSmartCloudUnavailableError("Neo cloud unavailable, circuit open")
+        _LOGGER.debug("Circuit half-open, probing Neo cloud")
+        self._cb_state = CIRCUIT_HALF_OPEN
+        self._cb_probe_in_flight = True
+        return True
+
+    def _circuit_record_failure(self) -> None:
+        """Count a cloud failure and open the circuit at the threshold."""
+        self._cb_failures += 1
+        if self._cb_state == CIRCUIT_HALF_OPEN or self._cb_failures >= CIRCUIT_FAILURE_THRESHOLD:
+            if self._cb_state != CIRCUIT_OPEN:
+                _LOGGER.warning(
+                    "Neo cloud failed %s times in a row, pausing requests for %s seconds",
+                    self._cb_failures, CIRCUIT_RESET_TIMEOUT
+                )
+            self._cb_state = CIRCUIT_OPEN
+            self._cb_opened_at = time.monotonic()
+
+    def _circuit_record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        if self._cb_state != CIRCUIT_CLOSED:
+            _LOGGER.info("Neo cloud reachable again")
+        self._cb_state = CIRCUIT_CLOSED
+        self._cb_failures = 0
+
+    async def _request_with_retry(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request, retrying transient failures with full-jitter backoff.
+
+        Non-idempotent requests (anything but GET/HEAD) are only retried when
+        they never reached the server or were rejected with 429, so a command
+        is never actuated twice.
+        """
+        idempotent = method in ("GET", "HEAD")
+        for attempt in range(RETRY_ATTEMPTS):
+            # Stop retrying once failures (ours or concurrent ones) have opened the circuit
+            if self._cb_state == CIRCUIT_OPEN:
+                raise NeoSmartCloudUnavailableError("Neo cloud unavailable, circuit open")
+            last_attempt = attempt == RETRY_ATTEMPTS - 1
+            delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+            try:
+                # Held only for the request itself, not across backoff sleeps
+                async with self._request_semaphore:
+                    response = await self._client.request(method, url, **kwargs)
+            except httpx.TransportError as err:
+                self._circuit_record_failure()
+                if last_attempt or not (idempotent or isinstance(err, RETRY_SAFE_ERRORS)):
+                    raise
+            else:
+                status = response.status_code
+                if last_attempt or status not in RETRY_STATUS_CODES or not (idempotent or status == 429):
+                    return response
+                if status >= 500:
+                    self._circuit_record_failure()
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = min(RETRY_MAX_DELAY, float(retry_after))
+            _LOGGER.debug("Retrying %s %s in %.2f seconds", method, url, delay)
+            await asyncio.sleep(delay)
+
     async def _api_request(self, method: str, url: str, **kwargs):
         """Make an authenticated API request, handling token refresh."""
-        if not self._access_token:
-            await self.async_login()
-        headers = kwargs.get("headers", {})
-        headers["Authorization"] = f"Bearer {self._access_token}"
-        # FIXED: Corrected protocol typos from api108.py
-        headers["Origin"] = "https://app.neosmartblinds.com"
-        headers["Referer"] = "https://app.neosmartblinds.com/"
-        kwargs["headers"] = headers
+        probing = self._circuit_check()
+        try:
+            return await self._api_request_admitted(method, url, **kwargs)
+        finally:
+            if probing:
+                # Let the next request probe if this one ended without settling the circuit
+                self._cb_probe_in_flight = False
+
+    async def _api_request_admitted(self, method: str, url: str, **kwargs):
+        """Send an authenticated request the circuit breaker has already admitted."""
+        await self.async_ensure_logged_in()
+        extra_headers = kwargs.get("headers", {})
+        kwargs["headers"] = {**extra_headers, **self._auth_headers}
         try:
             kwargs.setdefault('timeout', REQUEST_TIMEOUT)
-            response = await self._client.request(method, url, **kwargs)
+            token_before = self._access_token
+            response = await self._request_with_retry(method, url, **kwargs)
             if response.status_code == 401:
-                _LOGGER.debug("Token expired, attempting refresh")
-                if not await self.async_refresh_token():
-                    raise NeoSmartCloudAuthError("Token refresh failed")
-                headers["Authorization"] = f"Bearer {self._access_token}"
-                kwargs["headers"] = headers
-                response = await self._client.request(method, url, **kwargs)
+                async with self._refresh_lock:
+                    # Another request may have refreshed the token while we waited
+                    if self._access_token == token_before:
+                        _LOGGER.debug("Token expired, attempting refresh")
+                        if not await self.async_refresh_token():
+                            raise NeoSmartCloudAuthError("Token refresh failed")
+                kwargs["headers"] = {**extra_headers, **self._auth_headers}
+                response = await self._request_with_retry(method, url, **kwargs)
             response.raise_for_status()
+            self._circuit_record_success()
             return response
         except httpx.HTTPStatusError as err:
+            # Only server-side errors count; 4xx (including 401) are not outages
+            if err.response.status_code >= 500:
+                self._circuit_record_failure()
             _LOGGER.error("API request failed: %s", err)
             raise
         except Exception as err:
             _LOGGER.error("API request failed: %s", err)
             raise
 
-    def _parse_controller_map_from_token(self, access_token: str):
-        """Parse the access token to build the controller UUID-to-String map."""
+    def _parse_controller_map_from_token(self, token_payload: dict):
+        """Parse the decoded token payload to build the controller UUID-to-String map."""
         try:
-            controller_strings = self._decode_token(access_token, "ctrv2")
+            controller_strings = token_payload.get("ctrv2", [])
             if not controller_strings:
                 _LOGGER.error("Could not parse controller strings (ctrv2) from access token")
                 return
-            for full_string in controller_strings:
-                uuid = full_string.split(',')[0]
-                self._controller_map[uuid] = full_string
+            if controller_strings == self._controller_strings:
+                # Refreshed token carries the same controllers; keep the existing map
+                return
+            self._controller_map = {s.partition(',')[0]: s for s in controller_strings}
+            self._controller_strings = controller_strings
             _LOGGER.debug("Built controller map")
         except Exception as err:
             _LOGGER.error("Failed to parse controller map: %s", err)
 
     async def async_get_data(self) -> dict:
         """Get all user data (blinds, schedules) from the cloud."""
+        await self.async_ensure_logged_in()
         url = f"{API_LOCATION_URL}/{self._user_uuid}"
         response = await self._api_request("GET", url)
-        data = response.json()
+        data = json_loads(response.content)
         
         # MAINTAINED: Unredacted logging logic
-        if self._log_level == "Enable Full Payload Debug Logging":
-            _LOGGER.debug("Full API data payload received (UNREDACTED): %s", data)
-        else:
-            _LOGGER.debug("Full API data payload received")
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            if self._log_level == "Enable Full Payload Debug Logging":
+                _LOGGER.debug("Full API data payload received (UNREDACTED): %s", data)
+            else:
+                _LOGGER.debug("Full API data payload received")
 
         return data
 
     async def async_send_command(self, controller_id: str, blind_code: str, command: str, motor_code: str) -> bool:
         """Send a command to a specific blind."""
-        full_id_string = self._controller_map.get(controller_id)
-        if not full_id_string:
-            _LOGGER.error("No controller string found for UUID %s", controller_id)
-            return False
-            
         try:
             token, channel = blind_code.split('-')
         except ValueError:
             _LOGGER.error("Invalid blind_code format: %s", blind_code)
             return False
-            
+
+        # Coalesce a rapid repeat of the blind's last command; stops always go out
+        # and, like any other command, reset what counts as a repeat
+        key = (controller_id, blind_code)
+        now = time.monotonic()
+        last_command, sent_at = self._last_commands.get(key, (None, 0.0))
+        if command != CMD_STOP and command == last_command and now - sent_at < COMMAND_DEDUP_WINDOW:
+            _LOGGER.debug("Dropping duplicate command %s for %s", command, blind_code)
+            return True
+        entry = (command, now)
+        self._last_commands[key] = entry
+
+        if not await self.async_send_command_parsed(controller_id, token, channel, command, motor_code):
+            # Let an immediate retry through after a failure
+            if self._last_commands.get(key) is entry:
+                del self._last_commands[key]
+            return False
+        return True
+
+    async def async_send_command_parsed(
+        self, controller_id: str, token: str, channel: str, command: str, motor_code: str
+    ) -> bool:
+        """Send a command to a blind identified by its pre-split token and channel."""
+        return await self.async_send_commands([(controller_id, token, channel, command, motor_code)])
+
+    async def async_send_commands(self, commands: list[tuple[str, str, str, str, str]]) -> bool:
+        """Queue blind commands for the background writer and wait for the result.
+
+        Each command is a (controller_id, token, channel, command, motor_code)
+        tuple. Commands queued while a request is in flight are sent together
+        in the writer's next multi-transmit request.
+        """
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = self.hass.async_create_background_task(
+                self._async_command_writer(), f"{DOMAIN} command writer"
+            )
+        future = self.hass.loop.create_future()
+        self._command_queue.put_nowait((commands, future))
+        return await future
+
+    async def _async_command_writer(self) -> None:
+        """Drain the command queue, sending everything queued so far in one request."""
+        while True:
+            batch = [await self._command_queue.get()]
+            # Give commands fired together (scenes, "close all") a moment to join the batch
+            await asyncio.sleep(COMMAND_BATCH_WINDOW)
+            while not self._command_queue.empty():
+                batch.append(self._command_queue.get_nowait())
+            result = False
+            try:
+                result = await self._async_post_commands(
+                    [command for commands, _ in batch for command in commands]
+                )
+            finally:
+                for commands, future in batch:
+                    if not future.done():
+                        # Commands for unknown controllers were skipped, not sent
+                        future.set_result(result and any(
+                            command[0] in self._controller_map for command in commands
+                        ))
+
+    async def async_shutdown(self) -> None:
+        """Stop the background command writer and schedule flush."""
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            self._writer_task = None
+        while not self._command_queue.empty():
+            _, future = self._command_queue.get_nowait()
+            if not future.done():
+                future.set_result(False)
+        if self._schedule_flush_task is not None:
+            self._schedule_flush_task.cancel()
+            self._schedule_flush_task = None
+        for _, futures in self._pending_schedules.values():
+            for future in futures:
+                if not future.done():
+                    future.set_result(False)
+        self._pending_schedules = {}
+
+    async def _async_post_commands(self, commands: list[tuple[str, str, str, str, str]]) -> bool:
+        """Send blind commands in a single multi-transmit request.
+
+        Commands are grouped under their controller string in one payload.
+        """
+        # Setup from cached data logs in in the background; commands may beat it
+        try:
+            await self.async_ensure_logged_in()
+        except Exception:
+            _LOGGER.error("Failed to log in before sending commands", exc_info=True)
+            return False
+        # Commands built in the same loop share a millisecond, so one hash serves the batch
         hash_string = self._generate_hash()
-        url = API_COMMAND_URL
-        
-        payload = {
-            full_id_string: [
+        payload = defaultdict(list)
+        for controller_id, token, channel, command, motor_code in commands:
+            full_id_string = self._controller_map.get(controller_id)
+            if not full_id_string:
+                _LOGGER.error("No controller string found for UUID %s", controller_id)
+                continue
+            payload[full_id_string].append(
                 {
                     "token": token,
                     "command": command,
@@ -301,21 +551,26 @@ class NeoSmartCloudAPI:
                     "motor": motor_code,
                     "hash": hash_string
                 }
-            ]
-        }
+            )
+        if not payload:
+            return False
+        payload = dict(payload)
+        url = API_COMMAND_URL
 
         # MAINTAINED: Redacted/Full logging logic
-        if self._log_level == "Enable Full Payload Debug Logging":
-            _LOGGER.debug("Sending command to %s with FULL (UNREDACTED) payload: %s", url, payload)
-        elif self._log_level == "Enable Redacted Payload Debug Logging":
-            safe_payload = _sanitize_payload(payload)
-            _LOGGER.debug("Sending command to %s with SANITIZED payload: %s", url, safe_payload)
-        else: # This is "No Payload Logging"
-            _LOGGER.debug("Sending command to %s", url) 
+        # Skip payload sanitizing/formatting entirely when DEBUG is disabled
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            if self._log_level == "Enable Full Payload Debug Logging":
+                _LOGGER.debug("Sending command to %s with FULL (UNREDACTED) payload: %s", url, payload)
+            elif self._log_level == "Enable Redacted Payload Debug Logging":
+                safe_payload = _sanitize_payload(payload)
+                _LOGGER.debug("Sending command to %s with SANITIZED payload: %s", url, safe_payload)
+            else: # This is "No Payload Logging"
+                _LOGGER.debug("Sending command to %s", url) 
 
         try:
-            await self._api_request("POST", url, json=payload)
-            _LOGGER.info("Command sent successfully")
+            await self._api_request("POST", url, content=json_bytes(payload), headers=JSON_HEADERS)
+            _LOGGER.debug("Command sent successfully")
             return True
         except Exception:
             # Error logging is always sanitized
@@ -324,13 +579,55 @@ class NeoSmartCloudAPI:
             return False
 
     async def async_set_schedule_state(self, schedule_id: str, enabled: bool) -> bool:
-        """Enable or disable a cloud-based schedule."""
+        """Enable or disable a cloud-based schedule.
+
+        Toggles made within SCHEDULE_BATCH_WINDOW are flushed together, and
+        repeated toggles of the same schedule collapse into its latest state.
+        """
+        future = self.hass.loop.create_future()
+        _, futures = self._pending_schedules.get(schedule_id, (enabled, []))
+        futures.append(future)
+        self._pending_schedules[schedule_id] = (enabled, futures)
+        if self._schedule_flush_task is None or self._schedule_flush_task.done():
+            self._schedule_flush_task = self.hass.async_create_background_task(
+                self._async_flush_schedule_states(), f"{DOMAIN} schedule flush"
+            )
+        return await future
+
+    async def _async_flush_schedule_states(self) -> None:
+        """Send every pending schedule toggle concurrently over the pooled client.
+
+        Runs until no toggles are left, so ones made while a flush is in
+        flight are sent by the next round rather than stranded.
+        """
+        while self._pending_schedules:
+            await asyncio.sleep(SCHEDULE_BATCH_WINDOW)
+            pending, self._pending_schedules = self._pending_schedules, {}
+            results = [False] * len(pending)
+            try:
+                await self.async_ensure_logged_in()
+                results = await asyncio.gather(
+                    *(
+                        self._async_post_schedule_state(schedule_id, enabled)
+                        for schedule_id, (enabled, _) in pending.items()
+                    )
+                )
+            except Exception:
+                _LOGGER.error("Failed to log in before setting schedule state", exc_info=True)
+            finally:
+                for (_, futures), result in zip(pending.values(), results):
+                    for future in futures:
+                        if not future.done():
+                            future.set_result(result)
+
+    async def _async_post_schedule_state(self, schedule_id: str, enabled: bool) -> bool:
+        """Send a single schedule state change to the cloud."""
         _LOGGER.debug("Setting schedule %s to %s", schedule_id, enabled)
-        url = API_SCHEDULE_UPDATE_URL.format(uuid=self._user_uuid, schedule_id=schedule_id)
+        url = self._schedules_url + schedule_id
         payload = {"enabled": enabled} 
         try:
-            await self._api_request("POST", url, json=payload)
-            _LOGGER.info("Schedule state set successfully")
+            await self._api_request("POST", url, content=json_bytes(payload), headers=JSON_HEADERS)
+            _LOGGER.debug("Schedule state set successfully")
             return True
         except Exception:
             _LOGGER.error("Failed to set schedule state", exc_info=True)
@@ -338,110 +635,113 @@ class NeoSmartCloudAPI:
 
 # --- PARSER FUNCTIONS ---
 
-def parse_blinds_from_data(data: dict) -> list:
-    """Extract individual blind configurations with DEDUPLICATION."""
+@dataclass
+class ParsedData:
+    """Blinds, controllers, schedules and room groups parsed from the API data."""
+
+    blinds: list = field(default_factory=list)
+    controllers: list = field(default_factory=list)
+    schedules: list = field(default_factory=list)
+    rooms: list = field(default_factory=list)
+
+
+def parse_all(data: dict) -> ParsedData:
+    """Parse blinds, controllers, room groups and schedules in a single pass."""
+    parsed = ParsedData()
     blinds_dict = {} # Using a dictionary to prevent duplicate entities
+    seen_controllers = set()
     rooms = data.get("rooms", {})
     if not rooms:
         _LOGGER.warning("No rooms found in API response")
-        return []
+
     for room_id, room in rooms.items():
-        controller_id = room.get("controller") 
-        room_token = room.get("token") 
+        controller_id = room.get("controller")
+        room_token = room.get("token")
         room_name = room.get("name")
+
+        if controller_id and controller_id not in seen_controllers:
+            seen_controllers.add(controller_id)
+            parsed.controllers.append({
+                "id": controller_id,
+                "room_name": room.get("name", "Unknown Room")
+            })
         if not controller_id or not room_token:
             continue
+
+        blind_codes = []
+        motor_codes = []
+        # Per-room prefixes, built once rather than per blind
+        blind_code_prefix = f"{room_token}-"
+        unique_id_prefix = f"{controller_id}_"
         for channel, blind in room.get("blinds", {}).items():
             if not blind:
                 continue
-            blind_code = f"{room_token}-{channel.zfill(2)}"
-            unique_id = f"{controller_id}_{blind_code}"
-            
-            # IMPROVED: Prevent creating duplicate entities for the same blind
+            blind_code = blind_code_prefix + (_CHANNEL_CODES.get(channel) or channel.zfill(2))
+            motor_code = blind.get("motorCode", "unknown")
+            blind_codes.append(blind_code)
+            motor_codes.append(motor_code)
+            unique_id = unique_id_prefix + blind_code
+
+            # Prevent creating duplicate entities for the same blind
             if unique_id not in blinds_dict:
+                is_tdbu = blind.get("tdbu", False)
                 blinds_dict[unique_id] = {
                     "unique_id": unique_id,
                     "name": blind.get("name"),
                     "room_name": room_name,
                     "blind_code": blind_code,
                     "controller_id": controller_id,
-                    "has_percent": blind.get("hasPercent", False),
-                    "motor_code": blind.get("motorCode", "unknown"),
-                    "is_tdbu": blind.get("tdbu", False),
+                    # Capability resolved once so entities never re-inspect the raw blind
+                    "has_percent": bool(blind.get("hasPercent", False)),
+                    "motor_code": motor_code,
+                    "is_tdbu": is_tdbu,
+                    # Cover state attributes, built once here and shared by reference
+                    "attributes": {
+                        "room_name": room_name or "Unknown",
+                        "blind_code": blind_code,
+                        "controller_id": controller_id,
+                        "motor_code": motor_code,
+                        "is_tdbu": is_tdbu,
+                    },
                 }
-    return list(blinds_dict.values())
 
-def parse_schedules_from_data(data: dict) -> list:
-    """Extract cloud-based schedules from the API response."""
-    schedules_list = []
+        if blind_codes:
+            parsed.rooms.append({
+                "unique_id": f"room_{room_id}_{controller_id}",
+                "name": f"Room: {room_name}",
+                "room_name": room_name,
+                "controller_id": controller_id,
+                "blind_codes": blind_codes,
+                "motor_codes": motor_codes,
+            })
+
+    parsed.blinds = list(blinds_dict.values())
+
     schedules = data.get("schedules", {})
-    rooms = data.get("rooms", {})
     if not schedules:
         _LOGGER.info("No schedules found in API response")
-        return []
     for schedule_id, schedule in schedules.items():
         friendly_name = f"Schedule {schedule_id}"
+        room_id = schedule.get("room")
+        room = rooms.get(room_id) if room_id else None
         try:
             schedule_time = schedule.get("time", "Unknown Time")
             schedule_cmd = schedule.get("command", "cmd")
-            room_id = schedule.get("room")
-            room_name = "Unknown Room"
-            if room_id and room_id in rooms:
-                room_name = rooms[room_id].get("name", room_name)
+            room_name = room.get("name", "Unknown Room") if room else "Unknown Room"
             command_name = _get_friendly_command_name(schedule_cmd)
             friendly_name = f"{room_name} {command_name} at {schedule_time}"
         except Exception as e:
             _LOGGER.warning("Could not parse friendly name for schedule %s: %s", schedule_id, e)
-        schedule_data = schedule.copy()
-        schedule_data["id"] = schedule_id
-        if room_id and room_id in rooms:
-            schedule_data["room_name"] = rooms[room_id].get("name", "Unknown")
-            schedule_data["controller_id"] = rooms[room_id].get("controller")
-        schedule_data["name"] = friendly_name
-        schedules_list.append(schedule_data)
-    return schedules_list
-
-def parse_controllers_from_data(data: dict) -> list:
-    """Extract unique controllers from the room configurations."""
-    controllers = {}
-    rooms = data.get("rooms", {})
-    if not rooms:
-        _LOGGER.warning("No rooms found, cannot parse controllers.")
-        return []
-    for room in rooms.values():
-        controller_id = room.get("controller")
-        if controller_id and controller_id not in controllers:
-            controllers[controller_id] = {
-                "id": controller_id,
-                "room_name": room.get("name", "Unknown Room")
-            }
-    return list(controllers.values())
-    
-def parse_rooms_from_data(data: dict) -> list:
-    """Parse the rooms list to create group entities."""
-    rooms_list = []
-    rooms = data.get("rooms", {})
-    if not rooms:
-        return []
-
-    for room_id, room in rooms.items():
-        controller_id = room.get("controller")
-        room_token = room.get("token")
-        room_name = room.get("name")
-        if not controller_id or not room_token:
-            continue
-            
-        # Get all valid blind codes in this room
-        blind_codes = [f"{room_token}-{ch.zfill(2)}" for ch, b in room.get("blinds", {}).items() if b]
-        if not blind_codes:
-            continue
-
-        rooms_list.append({
-            "unique_id": f"room_{room_id}_{controller_id}",
-            "name": f"Room: {room_name}",
-            "room_name": room_name,
-            "controller_id": controller_id,
-            "blind_codes": blind_codes,
+        # Only keep the fields the schedule switches actually read
+        parsed.schedules.append({
+            "id": schedule_id,
+            "time": schedule.get("time"),
+            "command": schedule.get("command"),
+            "room": room_id,
+            "enabled": schedule.get("enabled", False),
+            "name": friendly_name,
+            "room_name": room.get("name", "Unknown") if room else "Unknown",
+            "controller_id": room.get("controller") if room else None,
         })
-            
-    return rooms_list
+
+    return parsed
@@ -1,25 +1,28 @@
 """Support for Neo Smart Blinds (Cloud) buttons."""
-import asyncio
 import logging
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity import DeviceInfo
 
 from .const import (
     DOMAIN, 
     CMD_FAV,
-    CMD_FAV2
-)
-from .api import (
-    NeoSmartCloudAPI, 
-    parse_blinds_from_data, 
-    parse_rooms_from_data
+    CMD_FAV2,
+    SIGNAL_FAVORITE_SENT
 )
+from .api import NeoSmartCloudAPI, ParsedData
+from .helpers import device_identifiers
 
 _LOGGER = logging.getLogger(__name__)
 
+# Favorite number -> command and icons (solid star for 1, star-check for 2)
+_FAV_CMDS = {1: CMD_FAV, 2: CMD_FAV2}
+_FAV_ICONS_BLIND = {1: "mdi:star", 2: "mdi:star-check"}
+_FAV_ICONS_ROOM = {1: "mdi:star-settings", 2: "mdi:star-cog"}
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -28,21 +31,33 @@ async def async_setup_entry(
     """Set up the Neo Smart Blinds buttons."""
     entry_data = hass.data[DOMAIN][entry.entry_id]
     controller: NeoSmartCloudAPI = entry_data["api"]
-    full_data: dict = entry_data["data"]
-    
-    entities = []
+    parsed: ParsedData = entry_data["parsed"]
     
-    # 1. Add Favorite buttons for individual blinds
-    blinds = parse_blinds_from_data(full_data)
-    for blind_data in blinds:
-        entities.append(NeoSmartBlindFavoriteButton(controller, blind_data, 1))
-        entities.append(NeoSmartBlindFavoriteButton(controller, blind_data, 2))
-        
-    # 2. Add Favorite buttons for Room groups
-    rooms = parse_rooms_from_data(full_data)
-    for room_data in rooms:
-        entities.append(NeoSmartRoomFavoriteButton(controller, room_data, 1))
-        entities.append(NeoSmartRoomFavoriteButton(controller, room_data, 2))
+    # Both favorite buttons of a blind share its DeviceInfo; room buttons share the controller's
+    blind_device_info = {
+        blind["unique_id"]: DeviceInfo(identifiers=device_identifiers(blind["unique_id"]))
+        for blind in parsed.blinds
+    }
+    controller_device_info = {
+        room["controller_id"]: DeviceInfo(identifiers=device_identifiers(room["controller_id"]))
+        for room in parsed.rooms
+    }
+
+    entities = [
+        # 1. Favorite buttons for individual blinds
+        NeoSmartBlindFavoriteButton(
+            controller, blind_data, fav_number, blind_device_info[blind_data["unique_id"]]
+        )
+        for blind_data in parsed.blinds
+        for fav_number in (1, 2)
+    ] + [
+        # 2. Favorite buttons for Room groups
+        NeoSmartRoomFavoriteButton(
+            controller, room_data, fav_number, controller_device_info[room_data["controller_id"]]
+        )
+        for room_data in parsed.rooms
+        for fav_number in (1, 2)
+    ]
         
     async_add_entities(entities)
 
@@ -52,33 +67,37 @@ class NeoSmartBlindFavoriteButton(ButtonEntity):
     
     _attr_has_entity_name = True
 
-    def __init__(self, controller: NeoSmartCloudAPI, blind_data: dict, fav_number: int):
+    def __init__(
+        self, controller: NeoSmartCloudAPI, blind_data: dict, fav_number: int, device_info: DeviceInfo
+    ):
         """Initialize the button."""
         self._controller = controller
-        self._blind_code = blind_data["blind_code"]
+        self._blind_unique_id = blind_data["unique_id"]
+        # The blind code never changes, so split it once instead of per press
+        self._token, self._channel = blind_data["blind_code"].split('-')
         self._controller_id = blind_data["controller_id"]
+        self._motor_code = blind_data.get("motor_code", "unknown")
         self._fav_number = fav_number
-        self._command = CMD_FAV if fav_number == 1 else CMD_FAV2
+        self._command = _FAV_CMDS[fav_number]
         
         self._attr_unique_id = f"{blind_data['unique_id']}_fav_{fav_number}"
         self._attr_name = f"Favorite {fav_number}"
         
-        # DISTINCTION: Solid star for 1, Star-Check for 2
-        self._attr_icon = "mdi:star" if fav_number == 1 else "mdi:star-check"
+        self._attr_icon = _FAV_ICONS_BLIND[fav_number]
         
         # Link to the blind device
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, blind_data["unique_id"])}
-        )
+        self._attr_device_info = device_info
 
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self._controller.async_send_command(
+        if await self._controller.async_send_command_parsed(
             self._controller_id, 
-            self._blind_code, 
+            self._token, 
+            self._channel, 
             self._command,
             self._motor_code
-        )
+        ):
+            async_dispatcher_send(self.hass, SIGNAL_FAVORITE_SENT.format(self._blind_unique_id))
 
 
 class NeoSmartRoomFavoriteButton(ButtonEntity):
@@ -87,24 +106,32 @@ class NeoSmartRoomFavoriteButton(ButtonEntity):
     # Show exactly as "Room: Dining Favorite 1"
     _attr_has_entity_name = False 
 
-    def __init__(self, controller: NeoSmartCloudAPI, room_data: dict, fav_number: int):
+    def __init__(
+        self, controller: NeoSmartCloudAPI, room_data: dict, fav_number: int, device_info: DeviceInfo
+    ):
         """Initialize the room favorite button."""
         self._controller = controller
         self._controller_id = room_data["controller_id"]
-        self._blind_codes = room_data["blind_codes"]
         self._fav_number = fav_number
-        self._command = CMD_FAV if fav_number == 1 else CMD_FAV2
+        self._command = _FAV_CMDS[fav_number]
+        # Every blind in the room is sent in one multi-transmit request
+        self._commands = [
+            (self._controller_id, *code.split('-'), self._command, motor_code)
+            for code, motor_code in zip(room_data["blind_codes"], room_data["motor_codes"])
+        ]
+        
+        self._blind_unique_ids = [
+            f"{self._controller_id}_{code}" for code in room_data["blind_codes"]
+        ]
         
         self._attr_unique_id = f"{room_data['unique_id']}_fav_{fav_number}"
         self._attr_name = f"{room_data['name']} Favorite {fav_number}"
         
         # Room-specific favorite icons
-        self._attr_icon = "mdi:star-settings" if fav_number == 1 else "mdi:star-cog"
+        self._attr_icon = _FAV_ICONS_ROOM[fav_number]
         
         # Link to the Controller device
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, self._controller_id)}
-        )
+        self._attr_device_info = device_info
 
     async def async_press(self) -> None:
         """Handle the button press for the entire room."""
@@ -112,9 +139,6 @@ class NeoSmartRoomFavoriteButton(ButtonEntity):
             "Triggering Favorite %s for all blinds in room: %s", 
             self._fav_number, self._attr_name
         )
-        await asyncio.gather(*(
-            self._controller.async_send_command(
-                self._controller_id, code, self._command, self._motor_code
-            )
-            for code in self._blind_codes
-        ))
+        if await self._controller.async_send_commands(self._commands):
+            for unique_id in self._blind_unique_ids:
+                async_dispatcher_send(self.hass, SIGNAL_FAVORITE_SENT.format(unique_id))
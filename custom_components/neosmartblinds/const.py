@@ -8,7 +8,8 @@ API_TOKEN_URL = f"{API_BASE_URL}/oauth/token"
 API_LOCATION_URL = f"{API_BASE_URL}/location" 
 
 API_COMMAND_URL = f"{API_BASE_URL}/esp32/multi-transmit"
-API_SCHEDULE_UPDATE_URL = f"{API_BASE_URL}/location/{{uuid}}/schedules/{{schedule_id}}"
+# Formatted once per user; schedule ids are appended per request
+API_SCHEDULES_URL = f"{API_BASE_URL}/location/{{uuid}}/schedules/"
 
 CMD_UP = "up"
 CMD_DOWN = "dn"
@@ -23,5 +24,8 @@ CMD_TDBU_MIDDLE_DOWN = "d4"
 CMD_TDBU_LOWER_UP = "u2"
 CMD_TDBU_LOWER_DOWN = "d2"
 
+# Dispatched with a blind's unique_id after a favorite moved it to an unknown position
+SIGNAL_FAVORITE_SENT = f"{DOMAIN}_favorite_sent_{{}}"
+
 CLIENT_ID = "ha_production_client"
 OAUTH_REDIRECT_URI = "https://homeassistant.io/oauth/callback"
@@ -7,7 +7,9 @@ from homeassistant.components.cover import (
     ATTR_POSITION,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity import DeviceInfo
 
@@ -17,16 +19,24 @@ from .const import (
     CMD_DOWN, 
     CMD_STOP,
     CMD_FAV,
-    CMD_FAV2
-)
-from .api import (
-    NeoSmartCloudAPI, 
-    parse_blinds_from_data, 
-    parse_rooms_from_data
+    CMD_FAV2,
+    SIGNAL_FAVORITE_SENT
 )
+from .api import NeoSmartCloudAPI, ParsedData
+from .helpers import device_identifiers
 
 _LOGGER = logging.getLogger(__name__)
 
+# Two-digit position command for every percentage, indexed by position
+_POSITION_CMDS = tuple(f"{i:02d}" for i in range(101))
+
+# Feature sets shared by every blind, picked by its has_percent capability
+_BLIND_FEATURES = CoverEntityFeature.OPEN | CoverEntityFeature.CLOSE | CoverEntityFeature.STOP
+_BLIND_FEATURES_POSITION = _BLIND_FEATURES | CoverEntityFeature.SET_POSITION
+
+# Seconds to collect slider moves so only the last position of a drag is sent
+POSITION_DEBOUNCE_COOLDOWN = 0.3
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -35,32 +45,22 @@ async def async_setup_entry(
     """Set up the Neo Smart Blinds cover entities."""
     entry_data = hass.data[DOMAIN][entry.entry_id]
     controller: NeoSmartCloudAPI = entry_data["api"]
-    full_data: dict = entry_data["data"]
-    
-    entities = []
+    parsed: ParsedData = entry_data["parsed"]
     
-    # 1. Add individual blinds
-    blinds = parse_blinds_from_data(full_data)
-    if blinds:
-        for blind_data in blinds:
-            entities.append(
-                NeoSmartCloudCover(
-                    controller, 
-                    blind_data, 
-                    entry.data["username"]
-                )
-            )
-        
-    # 2. Add room groups
-    rooms = parse_rooms_from_data(full_data)
-    if rooms:
-        for room_data in rooms:
-            entities.append(
-                NeoSmartRoomCover(
-                    controller, 
-                    room_data
-                )
-            )
+    # Rooms on the same controller share a command lock
+    controller_locks: dict[str, asyncio.Lock] = entry_data["locks"]
+    for room_data in parsed.rooms:
+        controller_locks.setdefault(room_data["controller_id"], asyncio.Lock())
+
+    entities = [
+        # 1. Individual blinds
+        NeoSmartCloudCover(controller, blind_data, entry.data["username"])
+        for blind_data in parsed.blinds
+    ] + [
+        # 2. Room groups
+        NeoSmartRoomCover(controller, room_data, controller_locks[room_data["controller_id"]])
+        for room_data in parsed.rooms
+    ]
         
     if entities:
         async_add_entities(entities)
@@ -81,81 +81,167 @@ class NeoSmartCloudCover(CoverEntity):
         self._motor_code = blind_data.get("motor_code", "unknown")
 
         self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, self._attr_unique_id)},
+            identifiers=device_identifiers(self._attr_unique_id),
             name=blind_data["name"], # The simple name used for the entity
             manufacturer="Neo Smart Blinds",
             model=f"Blind (Motor: {self._motor_code.upper()})",
             via_device=(DOMAIN, self._controller_id) 
         )
         
-        self._extra_attributes = {
-            "room_name": blind_data.get("room_name", "Unknown"),
-            "blind_code": self._blind_code,
-            "controller_id": self._controller_id,
-            "motor_code": self._motor_code,
-            "is_tdbu": blind_data.get("is_tdbu", False),
-        }
+        # Read-only, so the dict built at parse time is shared rather than copied
+        self._extra_attributes = blind_data["attributes"]
      
-        features = (
-            CoverEntityFeature.OPEN
-            | CoverEntityFeature.CLOSE
-            | CoverEntityFeature.STOP
+        self._attr_supported_features = (
+            _BLIND_FEATURES_POSITION if blind_data["has_percent"] else _BLIND_FEATURES
         )
-             
-        if blind_data.get("has_percent"):
-             features |= CoverEntityFeature.SET_POSITION
-             
-        self._attr_supported_features = features
         
         # Initial states - prevents AttributeError on startup
         self._attr_is_closed = None
         self._attr_current_cover_position = None
+
+        # Serializes overlapping commands so the controller never drops one
+        self._cmd_lock = asyncio.Lock()
+
+        # Latest requested position of a slider burst and the state before it started
+        self._pending_position: int | None = None
+        self._state_before_position = (None, None)
+        self._position_debouncer: Debouncer | None = None
         
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
         return self._extra_attributes
 
+    @property
+    def api(self) -> NeoSmartCloudAPI:
+        """Return the cloud API this blind's commands are sent through."""
+        return self._controller
+
+    @property
+    def command_lock(self) -> asyncio.Lock:
+        """Return the lock held while a command for this blind is being sent."""
+        return self._cmd_lock
+
+    @property
+    def command_targets(self) -> list[tuple[str, str, str, str]]:
+        """Return (controller_id, token, channel, motor_code) for batched commands."""
+        token, channel = self._blind_code.split('-')
+        return [(self._controller_id, token, channel, self._motor_code)]
+
+    async def async_added_to_hass(self) -> None:
+        """Reset the assumed state when a favorite button or room moves this blind."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_FAVORITE_SENT.format(self._attr_unique_id), self.favorite_sent
+            )
+        )
+        self._position_debouncer = Debouncer(
+            self.hass,
+            _LOGGER,
+            cooldown=POSITION_DEBOUNCE_COOLDOWN,
+            immediate=False,
+            function=self._async_send_pending_position,
+        )
+        self.async_on_remove(self._position_debouncer.async_cancel)
+
+    @callback
+    def _cancel_pending_position(self) -> bool:
+        """Drop a slider move still waiting in the debouncer, returning True if there was one."""
+        if self._pending_position is None:
+            return False
+        self._position_debouncer.async_cancel()
+        self._pending_position = None
+        return True
+
+    @callback
+    def favorite_sent(self) -> None:
+        """Update state after a favorite command was sent."""
+        # A pending slider move would pull the blind off its favorite position
+        self._cancel_pending_position()
+        # The blind is now at its favorite position, which is unknown here
+        if self._attr_is_closed is None and self._attr_current_cover_position is None:
+            return
+        self._attr_is_closed = None
+        self._attr_current_cover_position = None
+        self.async_write_ha_state()
+
+    async def _send_command(self, command: str) -> bool:
+        """Send a command to this blind, one at a time."""
+        async with self._cmd_lock:
+            return await self._controller.async_send_command(
+                self._controller_id, self._blind_code, command, self._motor_code
+            )
+
+    async def _apply(self, command: str, is_closed: bool | None, position: int | None):
+        """Show the target state right away and send the command in the background."""
+        previous = (self._attr_is_closed, self._attr_current_cover_position)
+        # This command supersedes a slider move that has not been sent yet
+        if self._cancel_pending_position():
+            previous = self._state_before_position
+        self._attr_is_closed = is_closed
+        self._attr_current_cover_position = position
+        self.async_write_ha_state()
+        self.hass.async_create_task(
+            self._send_and_revert(command, (is_closed, position), previous)
+        )
+
+    async def _send_and_revert(
+        self, command: str, target: tuple[bool | None, int | None], previous: tuple[bool | None, int | None]
+    ) -> None:
+        """Send a command, restoring the previous state if the cloud rejected it."""
+        if await self._send_command(command):
+            return
+        # Leave the state alone if a newer command has already replaced it
+        if (self._attr_is_closed, self._attr_current_cover_position) == target:
+            self._attr_is_closed, self._attr_current_cover_position = previous
+            self.async_write_ha_state()
+
     async def async_close_cover(self, **kwargs):
         """Close the cover."""
-        if await self._controller.async_send_command(self._controller_id, self._blind_code, CMD_DOWN, self._motor_code):
-            self._attr_is_closed = True
-            self._attr_current_cover_position = 0
-            self.async_write_ha_state()
+        await self._apply(CMD_DOWN, True, 0)
 
     async def async_open_cover(self, **kwargs):
         """Open the cover."""
-        if await self._controller.async_send_command(self._controller_id, self._blind_code, CMD_UP, self._motor_code):
-            self._attr_is_closed = False
-            self._attr_current_cover_position = 100
-            self.async_write_ha_state()
+        await self._apply(CMD_UP, False, 100)
 
     async def async_stop_cover(self, **kwargs):
         """Stop the cover."""
-        if await self._controller.async_send_command(self._controller_id, self._blind_code, CMD_STOP, self._motor_code):
-            self._attr_is_closed = None
-            self._attr_current_cover_position = None
-            self.async_write_ha_state()
+        await self._apply(CMD_STOP, None, None)
 
     async def async_set_cover_position(self, **kwargs):
         """Move the blind to a specific position."""
         position = kwargs[ATTR_POSITION]
         # Protocol supports positions 01-99; clamp to valid range
         position = max(1, min(99, position))
-        position_cmd = str(position).zfill(2)
-        
-        if await self._controller.async_send_command(self._controller_id, self._blind_code, position_cmd, self._motor_code):
-            self._attr_current_cover_position = position
-            self._attr_is_closed = position == 0
-            self.async_write_ha_state()
+        if self._pending_position is None:
+            self._state_before_position = (self._attr_is_closed, self._attr_current_cover_position)
+        self._pending_position = position
+        self._attr_current_cover_position = position
+        self._attr_is_closed = position == 0
+        self.async_write_ha_state()
+        await self._position_debouncer.async_call()
+
+    async def _async_send_pending_position(self) -> None:
+        """Send the last position requested during a slider burst."""
+        position = self._pending_position
+        if position is None:
+            return
+        self._pending_position = None
+        await self._send_and_revert(
+            _POSITION_CMDS[position], (position == 0, position), self._state_before_position
+        )
 
     async def favorite_1(self):
         """Trigger Favorite 1 for this blind."""
-        await self._controller.async_send_command(self._controller_id, self._blind_code, CMD_FAV, self._motor_code)
+        self._cancel_pending_position()
+        if await self._send_command(CMD_FAV):
+            self.favorite_sent()
 
     async def favorite_2(self):
         """Trigger Favorite 2 for this blind."""
-        await self._controller.async_send_command(self._controller_id, self._blind_code, CMD_FAV2, self._motor_code)
+        self._cancel_pending_position()
+        if await self._send_command(CMD_FAV2):
+            self.favorite_sent()
 
 
 class NeoSmartRoomCover(CoverEntity):
@@ -166,61 +252,89 @@ class NeoSmartRoomCover(CoverEntity):
     _attr_icon = "mdi:google-circles-group"
     _attr_assumed_state = True  # No state feedback from device; commands are fire-and-forget
 
-    def __init__(self, controller: NeoSmartCloudAPI, room_data: dict):
+    def __init__(self, controller: NeoSmartCloudAPI, room_data: dict, cmd_lock: asyncio.Lock):
         """Initialize the room group."""
         self._controller = controller
         self._attr_unique_id = room_data["unique_id"]
         self._attr_name = room_data["name"] # e.g., "Room: Dining"
         self._controller_id = room_data["controller_id"]
         self._blind_codes = room_data["blind_codes"]
+        self._motor_codes = room_data["motor_codes"]
         
         self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, self._controller_id)}
+            identifiers=device_identifiers(self._controller_id)
         )
         
-        self._attr_supported_features = (
-            CoverEntityFeature.OPEN
-            | CoverEntityFeature.CLOSE
-            | CoverEntityFeature.STOP
-        )
+        self._attr_supported_features = _BLIND_FEATURES
 
         # Initial states
         self._attr_is_closed = None
         self._attr_current_cover_position = None
 
-    async def _send_group_command(self, command: str):
-        """Send a command to all blinds in the room concurrently."""
-        await asyncio.gather(*(
-            self._controller.async_send_command(self._controller_id, code, command, self._motor_code)
-            for code in self._blind_codes
-        ))
+        # Shared with other rooms on the same controller
+        self._cmd_lock = cmd_lock
+
+    @property
+    def api(self) -> NeoSmartCloudAPI:
+        """Return the cloud API this room's commands are sent through."""
+        return self._controller
+
+    @property
+    def command_lock(self) -> asyncio.Lock:
+        """Return the controller lock held while a room command is being sent."""
+        return self._cmd_lock
+
+    @property
+    def command_targets(self) -> list[tuple[str, str, str, str]]:
+        """Return (controller_id, token, channel, motor_code) for batched commands."""
+        return [
+            (self._controller_id, *code.split('-'), motor_code)
+            for code, motor_code in zip(self._blind_codes, self._motor_codes)
+        ]
+
+    @callback
+    def favorite_sent(self) -> None:
+        """Update state after a favorite command was sent."""
+        if self._attr_is_closed is not None:
+            self._attr_is_closed = None
+            self.async_write_ha_state()
+        for code in self._blind_codes:
+            async_dispatcher_send(
+                self.hass, SIGNAL_FAVORITE_SENT.format(f"{self._controller_id}_{code}")
+            )
+
+    async def _send_group_command(self, command: str) -> bool:
+        """Send a command to all blinds in the room in a single request."""
+        async with self._cmd_lock:
+            return await self._controller.async_send_commands([
+                (controller_id, token, channel, command, motor_code)
+                for controller_id, token, channel, motor_code in self.command_targets
+            ])
+
+    async def _apply(self, command: str, is_closed: bool | None):
+        """Send a command to the room and record the resulting state if it was accepted."""
+        if await self._send_group_command(command):
+            self._attr_is_closed = is_closed
+            self.async_write_ha_state()
 
     async def async_open_cover(self, **kwargs):
         """Open all blinds in the room."""
-        await self._send_group_command(CMD_UP)
-        self._attr_is_closed = False
-        self.async_write_ha_state()
+        await self._apply(CMD_UP, False)
 
     async def async_close_cover(self, **kwargs):
         """Close all blinds in the room."""
-        await self._send_group_command(CMD_DOWN)
-        self._attr_is_closed = True
-        self.async_write_ha_state()
+        await self._apply(CMD_DOWN, True)
 
     async def async_stop_cover(self, **kwargs):
         """Stop all blinds in the room."""
-        await self._send_group_command(CMD_STOP)
-        self._attr_is_closed = None
-        self.async_write_ha_state()
+        await self._apply(CMD_STOP, None)
 
     async def favorite_1(self):
         """Trigger Favorite 1 for all blinds in the room."""
-        await self._send_group_command(CMD_FAV)
-        self._attr_is_closed = None
-        self.async_write_ha_state()
+        if await self._send_group_command(CMD_FAV):
+            self.favorite_sent()
 
     async def favorite_2(self):
         """Trigger Favorite 2 for all blinds in the room."""
-        await self._send_group_command(CMD_FAV2)
-        self._attr_is_closed = None
-        self.async_write_ha_state()
+        if await self._send_group_command(CMD_FAV2):
+            self.favorite_sent()
@@ -0,0 +1,10 @@
+"""Shared helpers for Neo Smart Blinds (Cloud) entities."""
+from functools import lru_cache
+
+from .const import DOMAIN
+
+
+@lru_cache(maxsize=None)
+def device_identifiers(unique_id: str) -> frozenset[tuple[str, str]]:
+    """Return the (cached) device registry identifiers for a device id."""
+    return frozenset({(DOMAIN, unique_id)})
@@ -7,7 +7,8 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity import DeviceInfo
 
 from .const import DOMAIN
-from .api import NeoSmartCloudAPI, parse_schedules_from_data
+from .api import NeoSmartCloudAPI, ParsedData
+from .helpers import device_identifiers
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,18 +20,26 @@ async def async_setup_entry(
     """Set up the Neo Smart Blinds schedule switches."""
     entry_data = hass.data[DOMAIN][entry.entry_id]
     controller: NeoSmartCloudAPI = entry_data["api"]
-    full_data: dict = entry_data["data"]
+    parsed: ParsedData = entry_data["parsed"]
     
-    schedules = parse_schedules_from_data(full_data)
+    schedules = parsed.schedules
     if not schedules:
         _LOGGER.info("Schedule setup: No schedules found.")
         return
 
+    # Schedules on the same controller share one DeviceInfo
+    controller_device_info = {
+        controller_id: DeviceInfo(identifiers=device_identifiers(controller_id))
+        for controller_id in {schedule["controller_id"] for schedule in schedules}
+        if controller_id
+    }
+
     entities = [
         NeoSmartScheduleSwitch(
             controller=controller,
             schedule_data=schedule,
-            account_username=entry.data["username"] # Pass this for via_device
+            account_username=entry.data["username"], # Pass this for via_device
+            device_info=controller_device_info.get(schedule["controller_id"]),
         )
         for schedule in schedules
     ]
@@ -42,29 +51,34 @@ class NeoSmartScheduleSwitch(SwitchEntity):
     _attr_has_entity_name = True
     _attr_icon = "mdi:calendar-clock"
 
-    def __init__(self, controller: NeoSmartCloudAPI, schedule_data: dict, account_username: str):
+    def __init__(
+        self,
+        controller: NeoSmartCloudAPI,
+        schedule_data: dict,
+        account_username: str,
+        device_info: DeviceInfo | None = None,
+    ):
         """Initialize the schedule switch."""
         self._controller = controller
         self._schedule_id = schedule_data["id"]
         self._controller_id = schedule_data.get("controller_id") # Get from parser
-        self._room_name = schedule_data.get("room_name", "Unknown")
+        # Read-only, so it is built once instead of on every state write
+        self._extra_attributes = {
+            "schedule_id": self._schedule_id,
+            "room_name": schedule_data.get("room_name", "Unknown"),
+        }
         
         self._attr_unique_id = self._schedule_id
         self._attr_name = schedule_data.get("name") # Name is now pre-built
         self._attr_is_on = schedule_data.get("enabled", False)
 
-        if self._controller_id:
-            self._attr_device_info = DeviceInfo(
-                identifiers={(DOMAIN, self._controller_id)}
-            )
+        if device_info is not None:
+            self._attr_device_info = device_info
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        return {
-            "schedule_id": self._schedule_id,
-            "room_name": self._room_name
-        }
+        return self._extra_attributes
 
     async def async_turn_on(self, **kwargs) -> None:
         """Enable the schedule."""
@@ -0,0 +1,111 @@
+"""Minimal stand-ins for the httpx and Home Assistant names the integration imports.
+
+Importing this module registers the stand-ins in sys.modules and makes the
+integration importable as the ``neosmartblinds`` package without running its
+``__init__.py``.
+"""
+import enum
+import json
+import sys
+import types
+from pathlib import Path
+
+
+COMPONENT_PATH = Path(__file__).resolve().parents[1] / "custom_components" / "neosmartblinds"
+
+
+def _stub_module(name: str, **attrs) -> None:
+    """Register a minimal stand-in for a module the integration imports."""
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules.setdefault(name, module)
+
+
+class _TransportError(Exception):
+    pass
+
+
+class _TimeoutException(_TransportError):
+    pass
+
+
+class _HTTPStatusError(Exception):
+    def __init__(self, message, *, request=None, response=None):
+        super().__init__(message)
+        self.request = request
+        self.response = response
+
+
+class _Response:
+    """Just the parts of httpx.Response the API reads."""
+
+    def __init__(self, status_code: int = 200, headers: dict | None = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise _HTTPStatusError(f"HTTP {self.status_code}", response=self)
+
+
+_stub_module(
+    "httpx",
+    AsyncClient=object,
+    Response=_Response,
+    HTTPStatusError=_HTTPStatusError,
+    TransportError=_TransportError,
+    TimeoutException=_TimeoutException,
+    ConnectError=type("ConnectError", (_TransportError,), {}),
+    ConnectTimeout=type("ConnectTimeout", (_TimeoutException,), {}),
+    PoolTimeout=type("PoolTimeout", (_TimeoutException,), {}),
+    ReadTimeout=type("ReadTimeout", (_TimeoutException,), {}),
+)
+
+
+class _Entity:
+    """Just the parts of a Home Assistant entity the platforms call."""
+
+    hass = None
+
+    def async_write_ha_state(self):
+        pass
+
+    def async_on_remove(self, func):
+        pass
+
+
+class _CoverEntityFeature(enum.IntFlag):
+    OPEN = 1
+    CLOSE = 2
+    SET_POSITION = 4
+    STOP = 8
+
+
+_stub_module("homeassistant")
+_stub_module("homeassistant.core", HomeAssistant=object, callback=lambda func: func)
+_stub_module("homeassistant.const", CONF_USERNAME="username", CONF_PASSWORD="password")
+_stub_module("homeassistant.config_entries", ConfigEntry=object)
+_stub_module("homeassistant.components")
+_stub_module(
+    "homeassistant.components.cover",
+    CoverEntity=_Entity,
+    CoverEntityFeature=_CoverEntityFeature,
+    ATTR_POSITION="position",
+)
+_stub_module("homeassistant.helpers")
+_stub_module("homeassistant.helpers.debounce", Debouncer=object)
+_stub_module(
+    "homeassistant.helpers.dispatcher",
+    async_dispatcher_connect=lambda hass, signal, target: lambda: None,
+    async_dispatcher_send=lambda hass, signal, *args: None,
+)
+_stub_module("homeassistant.helpers.entity", DeviceInfo=dict)
+_stub_module("homeassistant.helpers.entity_platform", AddEntitiesCallback=object)
+_stub_module("homeassistant.helpers.json", json_bytes=lambda obj: json.dumps(obj).encode())
+_stub_module("homeassistant.helpers.typing", ConfigType=dict)
+_stub_module("homeassistant.util")
+_stub_module("homeassistant.util.json", json_loads=json.loads)
+
+_package = types.ModuleType("neosmartblinds")
+_package.__path__ = [str(COMPONENT_PATH)]
+sys.modules.setdefault("neosmartblinds", _package)
@@ -0,0 +1,402 @@
+"""Tests for the cloud API client and location parser."""
+import asyncio
+import importlib
+import unittest
+from unittest import mock
+
+import ha_stubs  # noqa: F401  registers httpx/Home Assistant stand-ins
+
+api = importlib.import_module("neosmartblinds.api")
+
+
+LOCATION_DATA = {
+    "rooms": {
+        "r1": {
+            "controller": "ctrl-1",
+            "token": "AAA",
+            "name": "Living",
+            "blinds": {
+                "1": {"name": "Left", "motorCode": "ra", "hasPercent": 1},
+                "02": {"name": "Right", "motorCode": "no"},
+                "3": None,
+            },
+        },
+        "r2": {
+            "controller": "ctrl-1",
+            "token": "BBB",
+            "name": "Bedroom",
+            "blinds": {"1": {"name": "Bed"}},
+        },
+        "r3": {"controller": "ctrl-2", "name": "No token", "blinds": {}},
+    },
+    "schedules": {
+        "s1": {"room": "r1", "time": "08:00", "command": "up", "enabled": True},
+        "s2": {"room": "missing", "time": "20:00", "command": "42"},
+    },
+}
+
+
+class _FakeHass:
+    """Just enough of HomeAssistant for the API's background tasks and futures."""
+
+    @property
+    def loop(self):
+        return asyncio.get_running_loop()
+
+    def async_create_background_task(self, coro, name):
+        return asyncio.get_running_loop().create_task(coro, name=name)
+
+
+def _make_api():
+    return api.NeoSmartCloudAPI(
+        _FakeHass(), {"username": "user@example.com", "password": "secret"}, client=None
+    )
+
+
+def _make_api():
+    return api.NeoSmartCloudAPI(
+        _FakeHass(), {"username": "user@example.com", "password": "secret"}, client=None
+    )
+
+
+class ParseAllTest(unittest.TestCase):
+    def test_parses_blinds_rooms_and_controllers(self):
+        parsed = api.parse_all(LOCATION_DATA)
+
+        self.assertEqual(
+            [blind["unique_id"] for blind in parsed.blinds],
+            ["ctrl-1_AAA-01", "ctrl-1_AAA-02", "ctrl-1_BBB-01"],
+        )
+        left = parsed.blinds[0]
+        self.assertIs(left["has_percent"], True)
+        self.assertEqual(left["motor_code"], "ra")
+        self.assertEqual(left["attributes"]["room_name"], "Living")
+        self.assertIs(parsed.blinds[2]["has_percent"], False)
+        self.assertEqual(parsed.blinds[2]["motor_code"], "unknown")
+
+        self.assertEqual(
+            parsed.controllers,
+            [{"id": "ctrl-1", "room_name": "Living"}, {"id": "ctrl-2", "room_name": "No token"}],
+        )
+        self.assertEqual(
+            [(room["name"], room["blind_codes"], room["motor_codes"]) for room in parsed.rooms],
+            [
+                ("Room: Living", ["AAA-01", "AAA-02"], ["ra", "no"]),
+                ("Room: Bedroom", ["BBB-01"], ["unknown"]),
+            ],
+        )
+
+    def test_parses_schedules_with_friendly_names(self):
+        schedules = {s["id"]: s for s in api.parse_all(LOCATION_DATA).schedules}
+
+        self.assertEqual(schedules["s1"]["name"], "Living Open at 08:00")
+        self.assertEqual(schedules["s1"]["controller_id"], "ctrl-1")
+        self.assertTrue(schedules["s1"]["enabled"])
+        self.assertEqual(schedules["s2"]["name"], "Unknown Room Position 42% at 20:00")
+        self.assertIsNone(schedules["s2"]["controller_id"])
+        self.assertFalse(schedules["s2"]["enabled"])
+
+
+class SanitizePayloadTest(unittest.TestCase):
+    def test_redacts_without_mutating(self):
+        payload = {
+            "controller-string": [
+                {"token": "AAA", "channel": "01", "command": "up", "hash": "1234567"}
+            ]
+        }
+
+        sanitized = api._sanitize_payload(payload)
+
+        self.assertEqual(
+            sanitized,
+            {
+                "[REDACTED_CONTROLLER_ID:cont...]": [
+                    {
+                        "token": "[REDACTED_TOKEN]",
+                        "channel": "01",
+                        "command": "up",
+                        "hash": "[REDACTED_HASH]",
+                    }
+                ]
+            },
+        )
+        self.assertEqual(payload["controller-string"][0]["token"], "AAA")
+
+
+class GenerateHashTest(unittest.TestCase):
+    def test_is_last_seven_millisecond_digits(self):
+        cloud_api = _make_api()
+
+        with mock.patch.object(api.time, "time_ns", return_value=1_700_000_001_234_999_999):
+            self.assertEqual(cloud_api._generate_hash(), "0001234")
+
+
+class CommandDedupTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.api = _make_api()
+        self.sent = []
+
+        async def send(controller_id, token, channel, command, motor_code):
+            self.sent.append(command)
+            return True
+
+        self.api.async_send_command_parsed = send
+
+    async def _send(self, command):
+        return await self.api.async_send_command("ctrl-1", "AAA-01", command, "ra")
+
+    async def test_drops_repeat_of_last_command_within_window(self):
+        self.assertTrue(await self._send(api.CMD_UP))
+        self.assertTrue(await self._send(api.CMD_UP))
+
+        self.assertEqual(self.sent, [api.CMD_UP])
+
+    async def test_different_command_resets_the_repeat(self):
+        for command in (api.CMD_UP, api.CMD_STOP, api.CMD_UP, api.CMD_DOWN, api.CMD_UP):
+            await self._send(command)
+
+        self.assertEqual(
+            self.sent, [api.CMD_UP, api.CMD_STOP, api.CMD_UP, api.CMD_DOWN, api.CMD_UP]
+        )
+
+    async def test_stop_is_never_dropped(self):
+        await self._send(api.CMD_STOP)
+        await self._send(api.CMD_STOP)
+
+        self.assertEqual(self.sent, [api.CMD_STOP, api.CMD_STOP])
+
+    async def test_repeat_after_window_is_sent(self):
+        with mock.patch.object(api.time, "monotonic", side_effect=[100.0, 101.0]):
+            await self._send(api.CMD_UP)
+            await self._send(api.CMD_UP)
+
+        self.assertEqual(self.sent, [api.CMD_UP, api.CMD_UP])
+
+
+class CommandWriterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_callers_with_only_unknown_controllers_get_false(self):
+        cloud_api = _make_api()
+        cloud_api._controller_map = {"ctrl-1": "controller-string"}
+        cloud_api.async_ensure_logged_in = mock.AsyncMock()
+        cloud_api._api_request = mock.AsyncMock()
+
+        results = await asyncio.gather(
+            cloud_api.async_send_commands([("ctrl-1", "AAA", "01", "up", "ra")]),
+            cloud_api.async_send_commands([("ctrl-9", "ZZZ", "01", "up", "ra")]),
+        )
+        await cloud_api.async_shutdown()
+
+        self.assertEqual(results, [True, False])
+        cloud_api._api_request.assert_awaited_once()
+
+
+class ScheduleFlushTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.api = _make_api()
+        self.api.async_ensure_logged_in = mock.AsyncMock()
+        self.posted = []
+        self.in_flight = asyncio.Event()
+
+        async def post(schedule_id, enabled):
+            self.posted.append((schedule_id, enabled))
+            self.in_flight.set()
+            await asyncio.sleep(0.05)
+            return True
+
+        self.api._async_post_schedule_state = post
+
+    async def asyncTearDown(self):
+        await self.api.async_shutdown()
+
+    async def test_toggle_during_flush_is_sent(self):
+        first = asyncio.ensure_future(self.api.async_set_schedule_state("s1", True))
+        await self.in_flight.wait()
+        second = asyncio.ensure_future(self.api.async_set_schedule_state("s2", False))
+
+        results = await asyncio.wait_for(asyncio.gather(first, second), timeout=2)
+
+        self.assertEqual(results, [True, True])
+        self.assertEqual(self.posted, [("s1", True), ("s2", False)])
+
+    async def test_repeated_toggles_collapse_to_latest_state(self):
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                self.api.async_set_schedule_state("s1", True),
+                self.api.async_set_schedule_state("s1", False),
+            ),
+            timeout=2,
+        )
+
+        self.assertEqual(results, [True, True])
+        self.assertEqual(self.posted, [("s1", False)])
+
+
+class CircuitBreakerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.api = _make_api()
+
+    def _open_circuit(self):
+        for _ in range(api.CIRCUIT_FAILURE_THRESHOLD):
+            self.api._circuit_record_failure()
+
+    async def test_opens_after_threshold_and_fails_fast(self):
+        for _ in range(api.CIRCUIT_FAILURE_THRESHOLD - 1):
+            self.api._circuit_record_failure()
+        self.assertFalse(self.api._circuit_check())
+
+        self.api._circuit_record_failure()
+
+        self.assertEqual(self.api._cb_state, api.CIRCUIT_OPEN)
+        with self.assertRaises(api.NeoSmartCloudUnavailableError):
+            self.api._circuit_check()
+
+    async def test_half_open_admits_a_single_probe(self):
+        self._open_circuit()
+        self.api._cb_opened_at -= api.CIRCUIT_RESET_TIMEOUT
+
+        self.assertTrue(self.api._circuit_check())
+        self.assertEqual(self.api._cb_state, api.CIRCUIT_HALF_OPEN)
+        with self.assertRaises(api.NeoSmartCloudUnavailableError):
+            self.api._circuit_check()
+
+    async def test_probe_success_closes_and_failure_reopens(self):
+        self._open_circuit()
+        self.api._cb_opened_at -= api.CIRCUIT_RESET_TIMEOUT
+        self.api._circuit_check()
+        self.api._circuit_record_failure()
+        self.assertEqual(self.api._cb_state, api.CIRCUIT_OPEN)
+
+        self.api._cb_opened_at -= api.CIRCUIT_RESET_TIMEOUT
+        self.api._cb_probe_in_flight = False
+        self.api._circuit_check()
+        self.api._circuit_record_success()
+
+        self.assertEqual(self.api._cb_state, api.CIRCUIT_CLOSED)
+        self.assertFalse(self.api._circuit_check())
+
+    async def test_unsettled_probe_hands_over_to_next_request(self):
+        self._open_circuit()
+        self.api._cb_opened_at -= api.CIRCUIT_RESET_TIMEOUT
+        self.api._api_request_admitted = mock.AsyncMock(side_effect=api.NeoSmartCloudAuthError)
+
+        with self.assertRaises(api.NeoSmartCloudAuthError):
+            await self.api._api_request("GET", "https://example.invalid")
+
+        self.assertFalse(self.api._cb_probe_in_flight)
+        self.assertTrue(self.api._circuit_check())
+
+
+class CachedSetupTest(unittest.IsolatedAsyncioTestCase):
+    def test_parse_ignores_fields_entities_do_not_use(self):
+        noisy = {**LOCATION_DATA, "lastSeen": 1700000000}
+
+        self.assertEqual(api.parse_all(noisy), api.parse_all(LOCATION_DATA))
+
+    async def test_rejected_credentials_are_not_posted_again(self):
+        cloud_api = _make_api()
+        cloud_api._client = mock.Mock(post=mock.AsyncMock(return_value=api.httpx.Response(401)))
+
+        for _ in range(3):
+            with self.assertRaises(api.NeoSmartCloudAuthError):
+                await cloud_api.async_ensure_logged_in()
+
+        cloud_api._client.post.assert_awaited_once()
+
+
+class RequestRetryTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.api = _make_api()
+        self.api._client = mock.Mock(request=mock.AsyncMock())
+        # Backoff sleeps are recorded instead of waited out
+        patcher = mock.patch.object(api, "asyncio", mock.Mock(sleep=mock.AsyncMock()))
+        self.sleep = patcher.start().sleep
+        self.addCleanup(patcher.stop)
+
+    def _respond(self, *results):
+        self.api._client.request.side_effect = list(results)
+
+    async def test_post_503_is_not_retried(self):
+        self._respond(api.httpx.Response(503))
+
+        response = await self.api._request_with_retry("POST", "https://example.invalid")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.api._client.request.await_count, 1)
+
+    async def test_post_read_timeout_is_not_retried(self):
+        self._respond(api.httpx.ReadTimeout("read timed out"))
+
+        with self.assertRaises(api.httpx.ReadTimeout):
+            await self.api._request_with_retry("POST", "https://example.invalid")
+
+        self.assertEqual(self.api._client.request.await_count, 1)
+
+    async def test_post_429_is_retried_after_retry_after(self):
+        self._respond(api.httpx.Response(429, {"Retry-After": "2"}), api.httpx.Response(200))
+
+        response = await self.api._request_with_retry("POST", "https://example.invalid")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.api._client.request.await_count, 2)
+        self.sleep.assert_awaited_once_with(2.0)
+
+    async def test_post_connect_error_is_retried(self):
+        self._respond(api.httpx.ConnectError("refused"), api.httpx.Response(200))
+
+        response = await self.api._request_with_retry("POST", "https://example.invalid")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.api._client.request.await_count, 2)
+
+    async def test_get_503_is_retried_until_attempts_run_out(self):
+        self._respond(*(api.httpx.Response(503) for _ in range(api.RETRY_ATTEMPTS)))
+
+        response = await self.api._request_with_retry("GET", "https://example.invalid")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.api._client.request.await_count, api.RETRY_ATTEMPTS)
+        for call in self.sleep.await_args_list:
+            self.assertLessEqual(call.args[0], api.RETRY_MAX_DELAY)
+
+    async def test_stops_once_the_circuit_opens(self):
+        def fail(*args, **kwargs):
+            self.api._cb_state = api.CIRCUIT_OPEN
+            raise api.httpx.ConnectError("refused")
+
+        self.api._client.request.side_effect = fail
+
+        with self.assertRaises(api.NeoSmartCloudUnavailableError):
+            await self.api._request_with_retry("GET", "https://example.invalid")
+
+        self.assertEqual(self.api._client.request.await_count, 1)
+
+
+class TokenRefreshTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_401s_trigger_a_single_refresh(self):
+        cloud_api = _make_api()
+        cloud_api._set_tokens("old-token", "refresh-token")
+
+        async def request(method, url, headers, **kwargs):
+            # Let every concurrent request see the expired token before any refresh
+            await asyncio.sleep(0)
+            status = 401 if headers["Authorization"] == "Bearer old-token" else 200
+            return api.httpx.Response(status)
+
+        async def refresh():
+            await asyncio.sleep(0)
+            cloud_api._set_tokens("new-token", "refresh-token")
+            return True
+
+        cloud_api._client = mock.Mock(request=mock.AsyncMock(side_effect=request))
+        cloud_api.async_refresh_token = mock.AsyncMock(side_effect=refresh)
+
+        responses = await asyncio.gather(
+            *(cloud_api._api_request("GET", "https://example.invalid") for _ in range(3))
+        )
+
+        self.assertEqual([response.status_code for response in responses], [200, 200, 200])
+        cloud_api.async_refresh_token.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
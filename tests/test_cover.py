@@ -0,0 +1,73 @@
+"""Tests for the Neo Smart Blinds cover entities."""
+import importlib
+import unittest
+from unittest import mock
+
+import ha_stubs  # noqa: F401  registers httpx/Home Assistant stand-ins
+
+cover = importlib.import_module("neosmartblinds.cover")
+
+
+BLIND_DATA = {
+    "unique_id": "ctrl-1_AAA-01",
+    "name": "Left",
+    "blind_code": "AAA-01",
+    "controller_id": "ctrl-1",
+    "motor_code": "ra",
+    "has_percent": True,
+    "attributes": {},
+}
+
+
+class PendingPositionTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.controller = mock.Mock(async_send_command=mock.AsyncMock(return_value=True))
+        self.cover = cover.NeoSmartCloudCover(self.controller, BLIND_DATA, "user@example.com")
+        self.cover._position_debouncer = mock.Mock(async_call=mock.AsyncMock())
+
+    def _sent_commands(self):
+        return [call.args[2] for call in self.controller.async_send_command.await_args_list]
+
+    async def test_favorite_drops_pending_slider_move(self):
+        await self.cover.async_set_cover_position(position=40)
+
+        await self.cover.favorite_1()
+        # The debouncer firing late must find nothing left to send
+        await self.cover._async_send_pending_position()
+
+        self.assertEqual(self._sent_commands(), [cover.CMD_FAV])
+        self.cover._position_debouncer.async_cancel.assert_called()
+        self.assertIsNone(self.cover._attr_current_cover_position)
+
+    async def test_favorite_sent_elsewhere_drops_pending_slider_move(self):
+        await self.cover.async_set_cover_position(position=40)
+
+        # Favorite buttons, rooms and services reach the cover through favorite_sent
+        self.cover.favorite_sent()
+        await self.cover._async_send_pending_position()
+
+        self.assertEqual(self._sent_commands(), [])
+        self.assertIsNone(self.cover._attr_is_closed)
+        self.assertIsNone(self.cover._attr_current_cover_position)
+
+    async def test_slider_burst_sends_only_last_position(self):
+        for position in (20, 30, 40):
+            await self.cover.async_set_cover_position(position=position)
+
+        await self.cover._async_send_pending_position()
+
+        self.assertEqual(self._sent_commands(), ["40"])
+
+    async def test_position_already_shown_is_still_sent(self):
+        await self.cover.async_set_cover_position(position=40)
+        await self.cover._async_send_pending_position()
+
+        # A remote may have moved the blind since, so the same position must go out again
+        await self.cover.async_set_cover_position(position=40)
+        await self.cover._async_send_pending_position()
+
+        self.assertEqual(self._sent_commands(), ["40", "40"])
+
+
+if __name__ == "__main__":
+    unittest.main()